@@ -4,18 +4,47 @@ Create a complete distribution package for Gmail Processor.
 """
 
 import os
+import json
 import shutil
 import platform
 from pathlib import Path
 
+from file_utils import fast_copy
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator; fall back to the stdlib encoder
+    orjson = None
+
+# Platform info is fixed for the lifetime of the script
+_SYSTEM = platform.system().lower()
+_ARCH = platform.machine().lower()
+
+def _dumps_indented(data) -> bytes:
+    """Encode data as 2-space indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+# Gmail API credentials template, encoded once at import
+_CREDENTIALS_TEMPLATE = {
+    "installed": {
+        "client_id": "your-client-id.googleusercontent.com",
+        "project_id": "your-project-id",
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+        "client_secret": "your-client-secret",
+        "redirect_uris": ["http://localhost"]
+    }
+}
+_CREDENTIALS_TEMPLATE_JSON = _dumps_indented(_CREDENTIALS_TEMPLATE)
+
 def create_distribution():
     """Create a complete distribution package."""
     
-    system = platform.system().lower()
-    arch = platform.machine().lower()
-    
     # Create distribution directory
-    dist_name = f"gmail_processor_{system}_{arch}"
+    dist_name = f"gmail_processor_{_SYSTEM}_{_ARCH}"
     dist_dir = Path(f"dist/{dist_name}")
     
     # Clean and create directory
@@ -26,7 +55,7 @@ def create_distribution():
     print(f"Creating distribution package: {dist_dir}")
     
     # Copy executable
-    exe_name = "gmail_processor.exe" if system == "windows" else "gmail_processor"
+    exe_name = "gmail_processor.exe" if _SYSTEM == "windows" else "gmail_processor"
     exe_source = Path(f"dist/{exe_name}")
     
     if not exe_source.exists():
@@ -35,36 +64,22 @@ def create_distribution():
         return False
     
     # Copy executable with platform-specific name
-    exe_target_name = f"gmail_processor_{system}_{arch}" + (".exe" if system == "windows" else "")
-    shutil.copy2(exe_source, dist_dir / exe_target_name)
+    exe_target_name = f"gmail_processor_{_SYSTEM}_{_ARCH}" + (".exe" if _SYSTEM == "windows" else "")
+    fast_copy(exe_source, dist_dir / exe_target_name)
     
     # Make executable on Unix systems
-    if system != "windows":
+    if _SYSTEM != "windows":
         os.chmod(dist_dir / exe_target_name, 0o755)
     
     # Copy configuration files
     config_files = [".env.example"]
     for config_file in config_files:
         if Path(config_file).exists():
-            shutil.copy2(config_file, dist_dir / config_file)
+            fast_copy(config_file, dist_dir / config_file)
             print(f"Copied {config_file}")
     
-    # Create credentials.json template if it doesn't exist
-    credentials_template = {
-        "installed": {
-            "client_id": "your-client-id.googleusercontent.com",
-            "project_id": "your-project-id",
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_secret": "your-client-secret",
-            "redirect_uris": ["http://localhost"]
-        }
-    }
-    
-    import json
-    with open(dist_dir / "credentials.json.example", "w") as f:
-        json.dump(credentials_template, f, indent=2)
+    # Create credentials.json template
+    (dist_dir / "credentials.json.example").write_bytes(_CREDENTIALS_TEMPLATE_JSON)
     print("Created credentials.json.example")
     
     # Create README
@@ -163,19 +178,17 @@ chmod +x {exe_target_name}
 For issues, check the project repository or ensure all environment variables are properly configured.
 """
     
-    with open(dist_dir / "README.txt", "w") as f:
-        f.write(readme_content)
+    (dist_dir / "README.txt").write_text(readme_content, encoding="utf-8", newline="\n")
     print("Created README.txt")
     
     # Create a simple batch/shell script to run the executable
-    if system == "windows":
+    if _SYSTEM == "windows":
         script_content = f"""@echo off
 echo Starting Gmail Processor...
 {exe_target_name}
 pause
 """
-        with open(dist_dir / "run_gmail_processor.bat", "w") as f:
-            f.write(script_content)
+        (dist_dir / "run_gmail_processor.bat").write_text(script_content, encoding="utf-8", newline="\r\n")
         print("Created run_gmail_processor.bat")
     else:
         script_content = f"""#!/bin/bash
@@ -184,8 +197,7 @@ cd "$(dirname "$0")"
 ./{exe_target_name}
 """
         script_path = dist_dir / "run_gmail_processor.sh"
-        with open(script_path, "w") as f:
-            f.write(script_content)
+        script_path.write_text(script_content, encoding="utf-8", newline="\n")
         os.chmod(script_path, 0o755)
         print("Created run_gmail_processor.sh")
     
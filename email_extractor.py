@@ -7,30 +7,105 @@ from email content using OpenAI and regex patterns.
 """
 
 import re
+import json
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
 import openai
+from rate_limiter import RateLimiter, estimate_tokens
+
+try:
+    import ahocorasick
+except ImportError:  # Optional accelerator; category matching falls back to regex
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator; JSON parsing falls back to the stdlib
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 logger = logging.getLogger(__name__)
 
+# Number of OpenAI extraction results kept per extractor, keyed by content hash
+OPENAI_CACHE_SIZE = 2048
+
+# Phone numbers are searched for in this many trailing characters, where
+# signatures live; bounds the scan on very large bodies
+PHONE_SCAN_WINDOW = 32 * 1024
+
+# Trailing body characters sent to OpenAI; signatures sit at the end and
+# quoted reply chains before them only add input tokens
+OPENAI_BODY_LIMIT = 4096
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Separators inside matched phone numbers, normalized to a single '-'
+_PHONE_SEPARATOR_RE = re.compile(r'[^\d+]+')
+
+# A non-capturing group of plain literals, e.g. (?:CEO|Vice President)
+_LITERAL_ALTERNATION_RE = re.compile(r'\(\?:[^()\[\]{}\\.*+?^$]+\)')
+
+# Regex results count as complete, and skip OpenAI, when they include a phone
+# number, a position and at least this many categories, counting only keywords
+# that stand as whole words
+MIN_REGEX_CATEGORIES = 2
+
+# Emails handed to each regex worker process per round trip
+REGEX_BATCH_CHUNKSIZE = 16
+
+# Maximum number of concurrent OpenAI requests issued by extract_many
+OPENAI_CONCURRENCY = 16
+
+# Completion tokens allowed per extraction request
+OPENAI_MAX_TOKENS = 300
+
+@lru_cache(maxsize=None)
+def _whole_word_re(keyword: str) -> re.Pattern:
+    """Match a lowercased keyword not embedded in a longer ASCII word or number"""
+    return re.compile(rf'(?<![a-z0-9]){re.escape(keyword)}(?![a-z0-9])')
+
 class EmailExtractor:
+    # Instructions shared by every extraction request; sent once as the
+    # system message so only the email itself is formatted per call
+    OPENAI_PROMPT_HEADER = """Extract the following information from the email. If any information is not available, use null for that field.
+
+1. phone_numbers: Array of phone numbers found in the email (Korean or international format)
+2. sender_position: The job title/position of the sender (e.g., "마케팅 팀장", "CEO", "Sales Manager")
+3. company_categories: Array of business categories/industries mentioned (e.g., ["IT", "마케팅", "E-commerce"])
+
+Respond with a JSON object of this shape:
+{"phone_numbers": ["phone1", "phone2"] or null, "sender_position": "position" or null, "company_categories": ["category1", "category2"] or null}"""
+    
     def __init__(self, openai_client: Dict[str, Any]):
         """
         Initialize the email extractor
         
         Args:
-            openai_client: Dictionary containing OpenAI client and model info
+            openai_client: Dictionary containing OpenAI client and model info,
+                optionally with a shared 'rate_limiter'
         """
         self.openai_client = openai_client
+        self.rate_limiter = openai_client.get('rate_limiter') or RateLimiter()
+        
+        # LRU cache of OpenAI extractions; repeated bodies skip the API call
+        self._openai_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._openai_cache_lock = threading.Lock()
         
-        # Korean phone number patterns
+        # Korean phone number pattern covering domestic (02-123-4567,
+        # 010-1234-5678) and international (+82-2-1234-5678, +82 10 1234 5678,
+        # +821012345678) formats. Domestic numbers start with 0 and need
+        # separators; after +82 they are optional. Numbers embedded in longer
+        # digit runs (order numbers, ISBNs) are not matched. Labels such as "Tel:" or "연락처:" need no pattern
+        # of their own since the number itself is matched wherever it appears.
         self.phone_patterns = [
-            r'(?:전화|휴대폰|핸드폰|연락처|Tel|Phone|Mobile|HP|M\.P)\s*:?\s*([0-9]{2,3}-[0-9]{3,4}-[0-9]{4})',
-            r'(?:T|전화)\s*[\.:]\s*([0-9]{2,3}-[0-9]{3,4}-[0-9]{4})',
-            r'([0-9]{3}-[0-9]{4}-[0-9]{4})',  # 010-1234-5678 format
-            r'([0-9]{2,3}-[0-9]{3,4}-[0-9]{4})',  # General Korean format
-            r'(\+82-[0-9]{1,2}-[0-9]{3,4}-[0-9]{4})',  # International format
-            r'(\+82\s?[0-9]{1,2}\s?[0-9]{3,4}\s?[0-9]{4})',  # International with spaces
+            r'(?<![0-9])((?:\+82[ \-]?0?[0-9]{1,2}[ \-]?[0-9]{3,4}[ \-]?|0[0-9]{1,2}[ \-][0-9]{3,4}[ \-])[0-9]{4})(?![0-9])',
         ]
         
         # Common job position keywords in Korean and English
@@ -108,6 +183,73 @@ class EmailExtractor:
             '컨설팅', 'Consulting', '서비스', 'Service', '스타트업', 'Startup',
             'NGO', '비영리', 'Non-profit', '정부', 'Government'
         ]
+        
+        # Precompile each pattern family into a single alternation so the
+        # text is scanned once per family instead of once per pattern. Word
+        # patterns are lowercased here and matched against lowercased text,
+        # which avoids per-character case folding in the regex engine.
+        self._phone_re = self._compile_alternation(self.phone_patterns)
+        # When every position pattern is a plain alternation of literals, the
+        # literals are matched longest first, so the regex picks the same
+        # leftmost-longest matches as the keyword automaton (e.g. '영업팀장'
+        # rather than '영업' and '팀장') whether or not pyahocorasick is installed
+        position_literals = self._position_literals(self.position_keywords)
+        if position_literals is not None:
+            self._position_re = self._compile_alternation(
+                re.escape(literal) for literal in
+                sorted(dict.fromkeys(literal.lower() for literal in position_literals), key=len, reverse=True)
+            )
+        else:
+            self._position_re = self._compile_alternation(
+                pattern.lower() for pattern in self.position_keywords
+            )
+        # Category keywords are literals and, like the automaton, every
+        # occurrence is reported, overlaps included ('Edtech' yields 'Edtech'
+        # and 'Tech'). The lookahead matches the longest keyword at each start
+        # position; shorter keywords that are prefixes of it come from
+        # _category_prefixes.
+        lowered_categories = sorted(
+            dict.fromkeys(keyword.lower() for keyword in self.category_keywords), key=len, reverse=True
+        )
+        self._category_re = re.compile(f"(?=({'|'.join(map(re.escape, lowered_categories))}))")
+        self._category_lookup = {keyword.lower(): keyword for keyword in self.category_keywords}
+        self._category_prefixes = {
+            word: [self._category_lookup[other] for other in lowered_categories if word.startswith(other)]
+            for word in lowered_categories
+        }
+        
+        # Aho-Corasick automaton matching all literal keywords in one pass.
+        # Position keywords are added too when every pattern is a plain
+        # alternation of literals, so positions and categories share a scan.
+        self._keyword_automaton = None
+        self._automaton_has_positions = False
+        if ahocorasick is not None:
+            entries: Dict[str, List[Any]] = {}
+            for keyword in self.category_keywords:
+                entries.setdefault(keyword.lower(), [None, False])[0] = keyword
+            for literal in position_literals or []:
+                entries.setdefault(literal.lower(), [None, False])[1] = True
+            
+            self._keyword_automaton = ahocorasick.Automaton()
+            for word, (category, is_position) in entries.items():
+                self._keyword_automaton.add_word(word, (len(word), category, is_position))
+            self._keyword_automaton.make_automaton()
+            self._automaton_has_positions = position_literals is not None
+    
+    @staticmethod
+    def _position_literals(patterns: List[str]) -> Optional[List[str]]:
+        """Split (?:a|b|c) patterns into their literals, or None if any is a real regex"""
+        literals = []
+        for pattern in patterns:
+            if not _LITERAL_ALTERNATION_RE.fullmatch(pattern):
+                return None
+            literals.extend(pattern[3:-1].split('|'))
+        return literals
+    
+    @staticmethod
+    def _compile_alternation(patterns) -> re.Pattern:
+        """Fuse several patterns into one compiled regex"""
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
     
     def extract_phone_numbers(self, text: str) -> List[str]:
         """
@@ -121,61 +263,130 @@ class EmailExtractor:
         """
         phone_numbers = []
         
-        for pattern in self.phone_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean up the phone number
-                cleaned = re.sub(r'[^\d\-\+]', '', match)
-                if len(cleaned) >= 10:  # Minimum valid phone number length
-                    phone_numbers.append(cleaned)
+        for match in self._phone_re.finditer(text[-PHONE_SCAN_WINDOW:]):
+            number = match.group(1)
+            # Normalize separators so '010 1234 5678' and '010-1234-5678' match
+            cleaned = _PHONE_SEPARATOR_RE.sub('-', number)
+            if len(cleaned) >= 10:  # Minimum valid phone number length
+                phone_numbers.append(cleaned)
         
         # Remove duplicates while preserving order
-        unique_phones = []
-        for phone in phone_numbers:
-            if phone not in unique_phones:
-                unique_phones.append(phone)
-        
-        return unique_phones
+        return list(dict.fromkeys(phone_numbers))
     
-    def extract_positions_regex(self, text: str) -> List[str]:
+    def extract_positions_regex(self, text: str, lowered_text: Optional[str] = None) -> List[str]:
         """
         Extract job positions from text using regex patterns
         
         Args:
             text: Input text to search for positions
+            lowered_text: text.lower(), if the caller already computed it
             
         Returns:
             List of found positions
         """
-        positions = []
+        if lowered_text is None:
+            lowered_text = text.lower()
         
-        for pattern in self.position_keywords:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            positions.extend(matches)
+        # Report matches in their original case where offsets line up
+        source = text if len(text) == len(lowered_text) else lowered_text
+        positions = [
+            source[match.start():match.end()]
+            for match in self._position_re.finditer(lowered_text)
+        ]
         
-        # Remove duplicates
-        unique_positions = list(set(positions))
-        return unique_positions
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(positions))
     
-    def extract_categories_regex(self, text: str) -> List[str]:
+    def extract_categories_regex(self, text: str, lowered_text: Optional[str] = None) -> List[str]:
         """
         Extract company categories from text using regex patterns
         
         Args:
             text: Input text to search for categories
+            lowered_text: text.lower(), if the caller already computed it
             
         Returns:
             List of found categories
         """
-        categories = []
+        if lowered_text is None:
+            lowered_text = text.lower()
         
-        for keyword in self.category_keywords:
-            if re.search(keyword, text, re.IGNORECASE):
-                categories.append(keyword)
+        if self._keyword_automaton is not None:
+            categories = self._order_categories(
+                (end, length, category)
+                for end, (length, category, _) in self._keyword_automaton.iter(lowered_text)
+                if category is not None
+            )
+        else:
+            categories = [
+                category
+                for match in self._category_re.finditer(lowered_text)
+                for category in self._category_prefixes[match.group(1)]
+            ]
         
-        # Remove duplicates
-        unique_categories = list(set(categories))
-        return unique_categories
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(categories))
+    
+    @staticmethod
+    def _order_categories(matches) -> List[str]:
+        """Order automaton (end, length, category) matches by start, longest first, as the regex reports them"""
+        return [category for _, _, category in sorted(
+            (end - length + 1, -length, category) for end, length, category in matches
+        )]
+    
+    @staticmethod
+    def _content_key(subject: str, body: str, sender_info: str) -> str:
+        """Hash the email fields into a compact cache key"""
+        content = f"{subject}\x00{body}\x00{sender_info}".encode('utf-8')
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    def _cache_openai_result(self, cache_key: str, result: Dict[str, Any]):
+        """Store a successful extraction, evicting the least recently used entry"""
+        with self._openai_cache_lock:
+            self._openai_cache[cache_key] = result
+            self._openai_cache.move_to_end(cache_key)
+            if len(self._openai_cache) > OPENAI_CACHE_SIZE:
+                self._openai_cache.popitem(last=False)
+    
+    def _get_cached_openai_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached extraction and mark it recently used"""
+        with self._openai_cache_lock:
+            cached = self._openai_cache.get(cache_key)
+            if cached is not None:
+                self._openai_cache.move_to_end(cache_key)
+            return cached
+    
+    @staticmethod
+    def _clean_body_for_prompt(body: str) -> str:
+        """Collapse whitespace and keep the tail of the body"""
+        # The body is already plain text (HTML parts are converted when the
+        # message is parsed), so '<...>' here is real content such as
+        # '김철수 <kim@abc.com>' and must not be stripped
+        return _WHITESPACE_RE.sub(' ', body).strip()[-OPENAI_BODY_LIMIT:]
+    
+    def _build_openai_messages(self, subject: str, body: str, sender_info: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a single email; only the user turn varies"""
+        return [
+            {"role": "system", "content": self.OPENAI_PROMPT_HEADER},
+            {"role": "user", "content": f"Sender: {sender_info}\nSubject: {subject}\nBody: {body}"},
+        ]
+    
+    def _estimate_request_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Estimate the tokens a request counts against the rate limit"""
+        return estimate_tokens(''.join(message["content"] for message in messages), OPENAI_MAX_TOKENS)
+    
+    def _parse_openai_response(self, cache_key: str, response) -> Dict[str, Any]:
+        """Parse the JSON reply of a chat completion and cache it on success"""
+        content = response.choices[0].message.content.strip()
+        
+        # Try to parse JSON response
+        try:
+            extracted_data = _json_loads(content)
+            self._cache_openai_result(cache_key, extracted_data)
+            return extracted_data
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse OpenAI JSON response: {content}")
+            return {"phone_numbers": None, "sender_position": None, "company_categories": None}
     
     def extract_with_openai(self, subject: str, body: str, sender_info: str = "") -> Dict[str, Any]:
         """
@@ -189,103 +400,294 @@ class EmailExtractor:
         Returns:
             Dictionary containing extracted information
         """
+        body = self._clean_body_for_prompt(body)
+        cache_key = self._content_key(subject, body, sender_info)
+        cached = self._get_cached_openai_result(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            prompt = f"""
-Extract the following information from this email. If any information is not available, return null for that field.
-
-Email Information:
-Sender: {sender_info}
-Subject: {subject}
-Body: {body}
-
-Please extract and return in JSON format:
-1. phone_numbers: Array of phone numbers found in the email (Korean or international format)
-2. sender_position: The job title/position of the sender (e.g., "마케팅 팀장", "CEO", "Sales Manager")
-3. company_categories: Array of business categories/industries mentioned (e.g., ["IT", "마케팅", "E-commerce"])
-
-Return only valid JSON without any additional text:
-{{
-    "phone_numbers": ["phone1", "phone2"] or null,
-    "sender_position": "position" or null,
-    "company_categories": ["category1", "category2"] or null
-}}
-"""
+            messages = self._build_openai_messages(subject, body, sender_info)
+            self.rate_limiter.acquire(self._estimate_request_tokens(messages))
 
-            response = self.openai_client['client'].chat.completions.create(
+            raw_response = self.openai_client['client'].chat.completions.with_raw_response.create(
                 model=self.openai_client['model'],
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=0.1,
-                max_tokens=300
+                max_tokens=OPENAI_MAX_TOKENS,
+                response_format={"type": "json_object"}
             )
+            self.rate_limiter.update_from_headers(raw_response.headers)
             
-            content = response.choices[0].message.content.strip()
-            
-            # Try to parse JSON response
-            try:
-                import json
-                extracted_data = json.loads(content)
-                return extracted_data
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse OpenAI JSON response: {content}")
-                return {"phone_numbers": None, "sender_position": None, "company_categories": None}
+            return self._parse_openai_response(cache_key, raw_response.parse())
             
         except Exception as e:
+            self.rate_limiter.update_from_error(e)
             logger.error(f"Error extracting with OpenAI: {e}")
             return {"phone_numbers": None, "sender_position": None, "company_categories": None}
     
-    def extract_all_information(self, subject: str, body: str, sender_info: str = "") -> Dict[str, Any]:
+    async def aextract_with_openai(self, subject: str, body: str, sender_info: str = "") -> Dict[str, Any]:
         """
-        Extract all information using both regex and OpenAI, combining results
+        Async variant of extract_with_openai using the AsyncOpenAI client
+        
+        Falls back to running the synchronous call in a worker thread when no
+        'async_client' is configured.
         
         Args:
             subject: Email subject
             body: Email body content
-            sender_info: Sender information
+            sender_info: Sender information (name, email, etc.)
             
         Returns:
-            Combined extraction results
+            Dictionary containing extracted information
+        """
+        async_client = self.openai_client.get('async_client')
+        if async_client is None:
+            return await asyncio.to_thread(self.extract_with_openai, subject, body, sender_info)
+        
+        body = self._clean_body_for_prompt(body)
+        cache_key = self._content_key(subject, body, sender_info)
+        cached = self._get_cached_openai_result(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            messages = self._build_openai_messages(subject, body, sender_info)
+            await self.rate_limiter.aacquire(self._estimate_request_tokens(messages))
+
+            raw_response = await async_client.chat.completions.with_raw_response.create(
+                model=self.openai_client['model'],
+                messages=messages,
+                temperature=0.1,
+                max_tokens=OPENAI_MAX_TOKENS,
+                response_format={"type": "json_object"}
+            )
+            self.rate_limiter.update_from_headers(raw_response.headers)
+            
+            return self._parse_openai_response(cache_key, raw_response.parse())
+            
+        except Exception as e:
+            self.rate_limiter.update_from_error(e)
+            logger.error(f"Error extracting with OpenAI: {e}")
+            return {"phone_numbers": None, "sender_position": None, "company_categories": None}
+    
+    async def extract_many(self, messages: List[Tuple[str, str, str]],
+                           concurrency: int = OPENAI_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Run OpenAI extraction for many emails concurrently
+        
+        Args:
+            messages: List of (subject, body, sender_info) tuples
+            concurrency: Maximum number of requests in flight
+            
+        Returns:
+            Extraction results in the same order as messages
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _one(subject: str, body: str, sender_info: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aextract_with_openai(subject, body, sender_info)
+        
+        return await asyncio.gather(*(_one(*message) for message in messages))
+    
+    def _scan_keywords(self, text: str, lowered_text: str) -> Tuple[List[str], List[str]]:
+        """
+        Find positions and categories in a single pass of the keyword automaton
+        
+        Returns:
+            Tuple of (positions, categories)
+        """
+        source = text if len(text) == len(lowered_text) else lowered_text
+        category_matches = []
+        position_spans = []
+        for end, (length, category, is_position) in self._keyword_automaton.iter(lowered_text):
+            if category is not None:
+                category_matches.append((end, length, category))
+            if is_position:
+                position_spans.append((end - length + 1, end + 1))
+        
+        # The automaton reports overlapping matches; keep the leftmost-longest
+        # non-overlapping ones, as the longest-first position regex does
+        positions = []
+        last_end = 0
+        for start, end in sorted(position_spans, key=lambda span: (span[0], -span[1])):
+            if start >= last_end:
+                positions.append(source[start:end])
+                last_end = end
+        
+        categories = self._order_categories(category_matches)
+        return list(dict.fromkeys(positions)), list(dict.fromkeys(categories))
+    
+    def _extract_regex(self, subject: str, body: str, sender_info: str = "") -> Tuple[List[str], List[str], List[str]]:
+        """
+        Run every regex extractor over the combined email text
+        
+        Returns:
+            Tuple of (phones, positions, categories)
         """
         # Combine subject and body for analysis
-        full_text = f"{subject} {body} {sender_info}"
+        full_text = self._full_text(subject, body, sender_info)
+        lowered_text = full_text.lower()
         
-        # Extract using regex
-        regex_phones = self.extract_phone_numbers(full_text)
-        regex_positions = self.extract_positions_regex(full_text)
-        regex_categories = self.extract_categories_regex(full_text)
+        phones = self.extract_phone_numbers(full_text)
+        if self._automaton_has_positions:
+            positions, categories = self._scan_keywords(full_text, lowered_text)
+        else:
+            positions = self.extract_positions_regex(full_text, lowered_text)
+            categories = self.extract_categories_regex(full_text, lowered_text)
+        
+        return phones, positions, categories
+    
+    @staticmethod
+    def _full_text(subject: str, body: str, sender_info: str) -> str:
+        """Text the regex extractors scan: subject, body and sender together"""
+        return f"{subject} {body} {sender_info}"
+    
+    @staticmethod
+    def _whole_word_matches(matches: List[str], lowered_text: str) -> List[str]:
+        """
+        Keep matches that occur as whole words somewhere in the text
         
-        # Extract using OpenAI
-        openai_results = self.extract_with_openai(subject, body, sender_info)
+        Keywords are matched as substrings, so ASCII ones also hit inside
+        longer words ('hr' in 'through', 'cto' in 'October'). Korean keywords
+        are kept as they are, since particles attach directly to words.
+        """
+        return [
+            match for match in matches
+            if not match.isascii() or _whole_word_re(match.lower()).search(lowered_text)
+        ]
+    
+    def _regex_is_complete(self, regex_results: Tuple[List[str], List[str], List[str]], lowered_text: str) -> bool:
+        """Whether regex confidently filled every field, making OpenAI unnecessary"""
+        regex_phones, regex_positions, regex_categories = regex_results
+        if not regex_phones:
+            return False
+        return bool(
+            self._whole_word_matches(regex_positions, lowered_text)
+            and len(self._whole_word_matches(regex_categories, lowered_text)) >= MIN_REGEX_CATEGORIES
+        )
+    
+    @staticmethod
+    def _combine_results(regex_results: Tuple[List[str], List[str], List[str]],
+                         openai_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge regex and OpenAI extractions into the final result"""
+        regex_phones, regex_positions, regex_categories = regex_results
         
         # Combine results
         all_phones = regex_phones.copy()
         if openai_results.get('phone_numbers'):
             all_phones.extend(openai_results['phone_numbers'])
         
+        # OpenAI's position comes first, so the model can override substring
+        # noise in the regex matches
         all_positions = regex_positions.copy()
         if openai_results.get('sender_position'):
-            all_positions.append(openai_results['sender_position'])
+            all_positions.insert(0, openai_results['sender_position'])
         
         all_categories = regex_categories.copy()
         if openai_results.get('company_categories'):
             all_categories.extend(openai_results['company_categories'])
         
-        # Remove duplicates and clean up
-        unique_phones = list(set(all_phones)) if all_phones else None
-        unique_positions = list(set(all_positions)) if all_positions else None
-        unique_categories = list(set(all_categories)) if all_categories else None
+        # Remove duplicates while preserving order, so results are deterministic
+        unique_phones = list(dict.fromkeys(all_phones)) if all_phones else None
+        unique_positions = list(dict.fromkeys(all_positions)) if all_positions else None
+        unique_categories = list(dict.fromkeys(all_categories)) if all_categories else None
         
         return {
             'phone_numbers': unique_phones,
             'sender_position': unique_positions[0] if unique_positions else None,  # Take first position
             'company_categories': unique_categories
         }
+    
+    def extract_all_information(self, subject: str, body: str, sender_info: str = "") -> Dict[str, Any]:
+        """
+        Extract all information using both regex and OpenAI, combining results
+        
+        Args:
+            subject: Email subject
+            body: Email body content
+            sender_info: Sender information
+            
+        Returns:
+            Combined extraction results
+        """
+        regex_results = self._extract_regex(subject, body, sender_info)
+        
+        # Extract using OpenAI, unless regex already filled every field
+        lowered_text = self._full_text(subject, body, sender_info).lower()
+        if self._regex_is_complete(regex_results, lowered_text):
+            logger.debug("Regex extraction found all fields, skipping OpenAI")
+            openai_results = {"phone_numbers": None, "sender_position": None, "company_categories": None}
+        else:
+            openai_results = self.extract_with_openai(subject, body, sender_info)
+        
+        return self._combine_results(regex_results, openai_results)
+    
+    def extract_all_information_batch(self, emails: List[Tuple[str, str, str]],
+                                      max_workers: Optional[int] = None,
+                                      loop: Optional[asyncio.AbstractEventLoop] = None) -> List[Dict[str, Any]]:
+        """
+        Extract information for many emails at once
+        
+        The CPU-bound regex phase runs on a process pool so it is not limited
+        by the GIL; the network-bound OpenAI calls for incomplete results then
+        run concurrently in this process via extract_many. Must be called
+        from synchronous code, outside a running event loop. Scripts using
+        it from a frozen executable must call multiprocessing.freeze_support().
+        
+        Args:
+            emails: List of (subject, body, sender_info) tuples
+            max_workers: Number of regex worker processes (default: CPU count)
+            loop: Event loop to run the OpenAI calls on. The async client's
+                pooled connections are bound to the loop that first used
+                them, so callers sharing the client with other async code
+                pass that code's loop; without one a temporary loop is used.
+            
+        Returns:
+            Combined extraction results in the same order as emails
+        """
+        if not emails:
+            return []
+        
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_regex_worker) as executor:
+            regex_results = list(executor.map(_extract_regex_worker, emails, chunksize=REGEX_BATCH_CHUNKSIZE))
+        
+        pending = [
+            i for i, (results, email) in enumerate(zip(regex_results, emails))
+            if not self._regex_is_complete(results, self._full_text(*email).lower())
+        ]
+        logger.debug(f"Regex extraction complete for {len(emails) - len(pending)}/{len(emails)} emails")
+        
+        openai_results = [{"phone_numbers": None, "sender_position": None, "company_categories": None}] * len(emails)
+        if pending:
+            coroutine = self.extract_many([emails[i] for i in pending])
+            fetched = loop.run_until_complete(coroutine) if loop is not None else asyncio.run(coroutine)
+            for i, result in zip(pending, fetched):
+                openai_results[i] = result
+        
+        return [
+            self._combine_results(regex_result, openai_result)
+            for regex_result, openai_result in zip(regex_results, openai_results)
+        ]
+
+# Per-process extractor used by extract_all_information_batch workers; regex
+# extraction needs no OpenAI client, so none is sent across processes
+_regex_worker_extractor: Optional[EmailExtractor] = None
+
+def _init_regex_worker():
+    global _regex_worker_extractor
+    _regex_worker_extractor = EmailExtractor({})
+
+def _extract_regex_worker(email: Tuple[str, str, str]) -> Tuple[List[str], List[str], List[str]]:
+    return _regex_worker_extractor._extract_regex(*email)
 
 def test_extractor():
     """Test function for the email extractor"""
     # Mock OpenAI client for testing
     mock_client = {
         'client': None,  # Would be actual OpenAI client
-        'model': 'gpt-3.5-turbo'
+        'model': 'gpt-4o-mini'
     }
     
     extractor = EmailExtractor(mock_client)
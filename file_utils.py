@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+File helpers shared by the build and distribution scripts.
+"""
+
+import os
+import sys
+import shutil
+import ctypes
+import ctypes.util
+
+# Chunk size handed to sendfile per call, and buffer size of the fallback copy
+_COPY_CHUNK_SIZE = 1 << 20
+
+# copyfile(3) flags on macOS
+_COPYFILE_ALL = 0x0F
+_COPYFILE_CLONE = 1 << 24
+
+
+def _copy_sendfile(src, dst):
+    """Copy file data in-kernel with os.sendfile (Linux)."""
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            offset = 0
+            while True:
+                sent = os.sendfile(dst_fd, src_fd, offset, _COPY_CHUNK_SIZE)
+                if sent == 0:
+                    break
+                offset += sent
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    shutil.copystat(src, dst)
+
+
+def _copy_readinto(src, dst):
+    """Copy a file through one reused buffer (portable fallback)."""
+    buffer = memoryview(bytearray(_COPY_CHUNK_SIZE))
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while (size := fsrc.readinto(buffer)):
+            fdst.write(buffer[:size])
+    shutil.copystat(src, dst)
+
+
+def _copy_darwin(src, dst):
+    """Clone or copy a file with copyfile(3) (macOS)."""
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    result = libc.copyfile(os.fsencode(src), os.fsencode(dst), None,
+                           _COPYFILE_ALL | _COPYFILE_CLONE)
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), src)
+
+
+def _copy_windows(src, dst):
+    """Copy a file with CopyFileW (Windows)."""
+    if not ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
+        raise ctypes.WinError()
+
+
+def fast_copy(src, dst):
+    """
+    Copy src to dst using the platform's native file copy.
+
+    dst may be a directory, in which case the file keeps its name. Falls
+    back to a buffered readinto copy when the native call is unavailable
+    or fails.
+    Returns the destination path.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+
+    try:
+        if sys.platform.startswith("linux"):
+            _copy_sendfile(src, dst)
+        elif sys.platform == "darwin":
+            _copy_darwin(src, dst)
+        elif sys.platform == "win32":
+            _copy_windows(src, dst)
+        else:
+            _copy_readinto(src, dst)
+    except (OSError, AttributeError):
+        _copy_readinto(src, dst)
+    return dst
@@ -8,14 +8,20 @@ summarizes content using OpenAI, and stores data in Supabase tables.
 
 import os
 import json
+import asyncio
 import base64
+import hashlib
 import logging
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from email.mime.text import MIMEText
-from email.utils import parseaddr
+from email.utils import parseaddr, parsedate_to_datetime
 
 import openai
 from dotenv import load_dotenv
@@ -25,8 +31,19 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from supabase import create_client, Client
-from email_validator import validate_email, EmailNotValidError
+from email_validator import validate_email, EmailNotValidError, SPECIAL_USE_DOMAIN_NAMES
 from email_extractor import EmailExtractor
+from rate_limiter import RateLimiter, estimate_tokens
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional accelerator; HTML falls back to regex tag stripping
+    LexborHTMLParser = None
+
+try:
+    import re2
+except ImportError:  # Optional accelerator; tag stripping falls back to the stdlib re engine
+    re2 = None
 
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -49,12 +66,111 @@ logger = logging.getLogger(__name__)
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Matched against raw UTF-8 bytes; '<' and '>' never occur inside multi-byte
+# sequences, so tags can be stripped before decoding. RE2 guarantees linear
+# time on untrusted HTML.
+_HTML_TAG_RE = (re2 if re2 is not None else re).compile(rb'<[^>]+>')
+
+# Whitespace runs, collapsed so SUMMARY_BODY_LIMIT counts visible text
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# company_entity columns cached per sender
+ENTITY_COLUMNS = 'id, email, phone_num, position, category'
+
+# Retries for rate-limited or failed OpenAI requests
+OPENAI_MAX_RETRIES = 5
+
+# mail_history rows sent per bulk INSERT
+MAIL_INSERT_BATCH_SIZE = 500
+
+# Body characters sent for summarization; bounds input tokens on long emails
+SUMMARY_BODY_LIMIT = 4000
+
+# Completion tokens allowed per summary
+SUMMARY_MAX_TOKENS = 180
+
+# Summary requests in flight at once, unless the OPENAI_CONCURRENCY
+# environment variable overrides it. Extraction calls are bounded
+# separately by email_extractor.OPENAI_CONCURRENCY.
+SUMMARY_CONCURRENCY = 10
+
+# Worker threads for per-message I/O (Supabase and OpenAI calls)
+PROCESSING_WORKERS = 20
+
+# Gmail accepts up to 100 calls per batch HTTP request, but larger batches
+# get many of their calls rejected with 429 Too Many Requests
+GMAIL_BATCH_SIZE = 50
+
+# Follow-up batches sent for calls rejected with 429 before giving up on them
+GMAIL_RATE_LIMIT_RETRIES = 4
+
+# Wait before the first follow-up batch; doubled for each later one
+GMAIL_RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
+# Values per Supabase IN filter (message IDs, summary hashes, sender emails);
+# the filter travels in the URL, so chunks keep it well under gateway limits
+IN_QUERY_BATCH_SIZE = 100
+
+# Gmail returns at most 500 message IDs per list page
+GMAIL_LIST_PAGE_SIZE = 500
+
+# Message IDs run through the pipeline together; one full list page
+PROCESS_BATCH_SIZE = 500
+
+# Distinct From headers remembered by the address parsers
+ADDRESS_CACHE_SIZE = 4096
+
+# Plain ASCII dot-atom addresses, which validate_email always accepts once the
+# length, hyphen and special-use domain checks in _is_simple_email pass
+_SIMPLE_EMAIL_RE = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+
+def _is_simple_email(email_addr: str) -> bool:
+    """True for common ASCII addresses that need no full validate_email pass."""
+    # '--' rules out IDNA-reserved labels such as xn--; those take the slow path
+    if len(email_addr) > 254 or '--' in email_addr or not _SIMPLE_EMAIL_RE.fullmatch(email_addr):
+        return False
+    local_part, domain = email_addr.rsplit('@', 1)
+    if len(local_part) > 64:
+        return False
+    domain = domain.lower()
+    return not any(domain == name or domain.endswith('.' + name) for name in SPECIAL_USE_DOMAIN_NAMES)
+
+# Senders repeat heavily (newsletters, notifications), so parse and validate
+# each distinct From header once
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _extract_email_from_address(address: str) -> Optional[str]:
+    try:
+        name, email_addr = parseaddr(address)
+        if email_addr:
+            if not _is_simple_email(email_addr):
+                # Syntax check only; deliverability would cost a DNS MX lookup
+                validate_email(email_addr, check_deliverability=False)
+            return email_addr.lower()
+    except (EmailNotValidError, Exception) as e:
+        logger.warning(f"Invalid email address {address}: {e}")
+    return None
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _extract_name_from_address(address: str) -> Optional[str]:
+    name, email_addr = parseaddr(address)
+    return name.strip() if name.strip() else None
+
 class GmailProcessor:
     def __init__(self):
         self.supabase: Client = self._init_supabase()
         self.gmail_service = self._init_gmail_service()
         self.openai_client = self._init_openai()
+        # One event loop for the processor's lifetime, so the async OpenAI
+        # client's pooled connections stay bound to a live loop
+        self._loop = asyncio.new_event_loop()
+        self.summary_concurrency = self._init_summary_concurrency()
         self.email_extractor = EmailExtractor(self.openai_client)
+        # company_entity rows by email, and emails known to have no row yet
+        self._entity_cache: Dict[str, Dict] = {}
+        self._missing_entity_emails: set = set()
         self.user_email = self._get_user_email()
         
     def _init_supabase(self) -> Client:
@@ -64,6 +180,8 @@ class GmailProcessor:
         if not url or not key:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
         
+        # The client builds its PostgREST session once and reuses it, so all
+        # table queries already share one keep-alive connection pool
         return create_client(url, key)
     
     def _init_gmail_service(self):
@@ -96,6 +214,8 @@ class GmailProcessor:
             with open(token_path, 'w') as token:
                 token.write(creds.to_json())
         
+        # build() wraps the credentials in one AuthorizedHttp keep-alive
+        # connection that every call, including batch requests, reuses
         return build('gmail', 'v1', credentials=creds)
     
     def _init_openai(self):
@@ -104,9 +224,27 @@ class GmailProcessor:
             raise ValueError("OPENAI_API_KEY must be set in environment variables")
         
         client = openai.OpenAI(api_key=api_key)
-        model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+        # The SDK retries 429/5xx responses with backoff, honouring Retry-After
+        async_client = openai.AsyncOpenAI(api_key=api_key, max_retries=OPENAI_MAX_RETRIES)
+        model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        # Shared by summaries and extraction, which draw on the same API key limits
+        rate_limiter = RateLimiter()
         
-        return {'client': client, 'model': model}
+        return {'client': client, 'async_client': async_client, 'model': model, 'rate_limiter': rate_limiter}
+    
+    @staticmethod
+    def _init_summary_concurrency() -> int:
+        value = os.getenv('OPENAI_CONCURRENCY')
+        if value is None:
+            return SUMMARY_CONCURRENCY
+        try:
+            concurrency = int(value)
+        except ValueError:
+            concurrency = 0
+        # A zero-sized semaphore would block every summary forever
+        if concurrency < 1:
+            raise ValueError(f"OPENAI_CONCURRENCY must be a positive integer, got {value!r}")
+        return concurrency
     
     def _get_user_email(self) -> str:
         try:
@@ -116,27 +254,88 @@ class GmailProcessor:
             logger.error(f"Error getting user email: {e}")
             return 'unknown@example.com'
     
-    def _extract_email_from_address(self, address: str) -> Optional[str]:
-        try:
-            name, email_addr = parseaddr(address)
-            if email_addr:
-                validate_email(email_addr)
-                return email_addr.lower()
-        except (EmailNotValidError, Exception) as e:
-            logger.warning(f"Invalid email address {address}: {e}")
-        return None
+    def _build_entity_data(self, email: str, name: Optional[str], subject: str, body_content: str) -> Dict:
+        """Build a new company_entity row with extracted contact information."""
+        # Nothing to extract from an empty message, so skip the OpenAI call
+        extracted_info = {}
+        if subject or body_content:
+            sender_info = f"{name} <{email}>" if name else email
+            extracted_info = self.email_extractor.extract_all_information(subject, body_content, sender_info)
+        
+        return {
+            'email': email,
+            'name': name or email.split('@')[0],
+            'company': email.split('@')[1] if '@' in email else None,
+            'phone_num': extracted_info.get('phone_numbers', [None])[0] if extracted_info.get('phone_numbers') else None,
+            'position': extracted_info.get('sender_position'),
+            'category': extracted_info.get('company_categories')
+        }
     
-    def _extract_name_from_address(self, address: str) -> Optional[str]:
-        name, email_addr = parseaddr(address)
-        return name.strip() if name.strip() else None
+    def _preload_company_entities(self, emails: List[str]):
+        """Load existing entities for many senders, one IN query per chunk."""
+        unique_emails = [email for email in dict.fromkeys(emails) if email not in self._entity_cache]
+        
+        for start in range(0, len(unique_emails), IN_QUERY_BATCH_SIZE):
+            chunk = unique_emails[start:start + IN_QUERY_BATCH_SIZE]
+            try:
+                response = self.supabase.table('company_entity').select(ENTITY_COLUMNS).in_('email', chunk).execute()
+            except Exception as e:
+                # Senders of a failed chunk are looked up one by one later
+                logger.error(f"Error preloading company entities: {e}")
+                continue
+            
+            for entity in response.data:
+                self._entity_cache[entity['email']] = entity
+            self._missing_entity_emails.update(email for email in chunk if email not in self._entity_cache)
+    
+    def _create_company_entities(self, parsed_messages: List[Dict]):
+        """Insert entities for all unseen senders with one bulk upsert."""
+        first_messages: Dict[str, Dict] = {}
+        for parsed in parsed_messages:
+            email = parsed['email']
+            if email in self._missing_entity_emails and email not in first_messages:
+                first_messages[email] = parsed
+        
+        if not first_messages:
+            return
+        
+        # Extraction is network-bound (OpenAI), so run it for all senders at once
+        with ThreadPoolExecutor(max_workers=PROCESSING_WORKERS) as executor:
+            new_entities = list(executor.map(
+                lambda parsed: self._build_entity_data(
+                    parsed['email'], parsed['name'], parsed['subject'], parsed['body_content']
+                ),
+                first_messages.values()
+            ))
+        
+        try:
+            # Rows created since the preload (e.g. by another run) are left as
+            # they are instead of failing the whole batch
+            response = self.supabase.table('company_entity').upsert(
+                new_entities, on_conflict='email', ignore_duplicates=True
+            ).execute()
+        except Exception as e:
+            # Senders left uncached are retried one by one in find_or_create_company_entity
+            logger.error(f"Error bulk creating company entities: {e}")
+            return
+        
+        # Every sender now has a row; those skipped as duplicates are not in
+        # the response and get looked up on first use
+        self._missing_entity_emails.difference_update(first_messages)
+        for entity in response.data:
+            self._entity_cache[entity['email']] = entity
+        logger.info(f"Created {len(response.data)} new company entities with extracted info")
     
     def find_or_create_company_entity(self, email: str, name: Optional[str] = None, 
                                     subject: str = "", body_content: str = "") -> Optional[str]:
         try:
-            response = self.supabase.table('company_entity').select('id, phone_num, position, category').eq('email', email).execute()
+            existing_entity = self._entity_cache.get(email)
+            if existing_entity is None and email not in self._missing_entity_emails:
+                response = self.supabase.table('company_entity').select(ENTITY_COLUMNS).eq('email', email).execute()
+                if response.data:
+                    existing_entity = self._entity_cache[email] = response.data[0]
             
-            if response.data:
-                existing_entity = response.data[0]
+            if existing_entity:
                 logger.info(f"Found existing company entity for {email}")
                 
                 # Check if we need to update missing information
@@ -165,27 +364,28 @@ class GmailProcessor:
                     if update_data:
                         update_response = self.supabase.table('company_entity').update(update_data).eq('id', existing_entity['id']).execute()
                         if update_response.data:
+                            existing_entity.update(update_data)
                             logger.info(f"Updated company entity {email} with extracted info: {update_data}")
                 
                 return existing_entity['id']
             
             # Create new entity with extracted information
-            sender_info = f"{name} <{email}>" if name else email
-            extracted_info = self.email_extractor.extract_all_information(subject, body_content, sender_info)
+            entity_data = self._build_entity_data(email, name, subject, body_content)
             
-            entity_data = {
-                'email': email,
-                'name': name or email.split('@')[0],
-                'company': email.split('@')[1] if '@' in email else None,
-                'phone_num': extracted_info.get('phone_numbers', [None])[0] if extracted_info.get('phone_numbers') else None,
-                'position': extracted_info.get('sender_position'),
-                'category': extracted_info.get('company_categories')
-            }
-            
-            response = self.supabase.table('company_entity').insert(entity_data).execute()
+            response = self.supabase.table('company_entity').upsert(
+                entity_data, on_conflict='email', ignore_duplicates=True
+            ).execute()
+            self._missing_entity_emails.discard(email)
             
             if response.data:
                 logger.info(f"Created new company entity for {email} with extracted info")
+                self._entity_cache[email] = response.data[0]
+                return response.data[0]['id']
+            
+            # The row already existed, so the upsert returned nothing
+            response = self.supabase.table('company_entity').select(ENTITY_COLUMNS).eq('email', email).execute()
+            if response.data:
+                self._entity_cache[email] = response.data[0]
                 return response.data[0]['id']
             
         except Exception as e:
@@ -193,104 +393,291 @@ class GmailProcessor:
         
         return None
     
-    def summarize_email_content(self, subject: str, body: str) -> str:
+    @staticmethod
+    def _summary_key(subject: str, body: str) -> str:
+        return hashlib.sha256(f"{subject}\x00{body}".encode('utf-8')).hexdigest()
+    
+    def _get_cached_summaries(self, content_hashes: List[str]) -> Dict[str, str]:
+        """Look up stored summaries for many content hashes, one IN query per chunk."""
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        summaries = {}
+        for start in range(0, len(unique_hashes), IN_QUERY_BATCH_SIZE):
+            chunk = unique_hashes[start:start + IN_QUERY_BATCH_SIZE]
+            try:
+                response = self.supabase.table('summary_cache').select('content_hash, summary').in_(
+                    'content_hash', chunk
+                ).execute()
+            except Exception as e:
+                logger.warning(f"Error reading summary cache: {e}")
+                continue
+            summaries.update((row['content_hash'], row['summary']) for row in response.data)
+        return summaries
+    
+    def _store_summaries(self, summaries: Dict[str, str]):
+        if not summaries:
+            return
+        
+        try:
+            self.supabase.table('summary_cache').upsert(
+                [{'content_hash': content_hash, 'summary': summary} for content_hash, summary in summaries.items()],
+                on_conflict='content_hash'
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Error writing summary cache: {e}")
+    
+    async def _generate_summary(self, subject: str, body: str) -> Optional[str]:
         try:
+            body = _WHITESPACE_RE.sub(' ', body).strip()
             prompt = f"""
             Summarize this email in Korean with 2-3 sentences. Focus on main purpose, key information, and action items. Return ONLY the summary text without any explanations, thinking process, or formatting:
             
             Subject: {subject}
-            Body: {body}...
+            Body: {body[:SUMMARY_BODY_LIMIT]}...
             """
 
-            response = self.openai_client['client'].chat.completions.create(
+            rate_limiter = self.openai_client['rate_limiter']
+            await rate_limiter.aacquire(estimate_tokens(prompt, SUMMARY_MAX_TOKENS))
+            
+            raw_response = await self.openai_client['async_client'].chat.completions.with_raw_response.create(
                 model=self.openai_client['model'],
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=200
+                max_tokens=SUMMARY_MAX_TOKENS,
+                stream=False
             )
+            rate_limiter.update_from_headers(raw_response.headers)
             
-            content = response.choices[0].message.content.strip()
+            content = raw_response.parse().choices[0].message.content.strip()
             return content
             
         except Exception as e:
+            self.openai_client['rate_limiter'].update_from_error(e)
             logger.error(f"Error summarizing email: {e}")
+            return None
+    
+    async def summarize_email_content(self, subject: str, body: str) -> str:
+        content_hash = self._summary_key(subject, body)
+        cached = self._get_cached_summaries([content_hash])
+        if content_hash in cached:
+            return cached[content_hash]
+        
+        summary = await self._generate_summary(subject, body)
+        if summary is None:
             return f"요약 생성 실패: {subject}"
+        
+        self._store_summaries({content_hash: summary})
+        return summary
+    
+    async def _summarize_with_sem(self, sem: asyncio.Semaphore, subject: str, body: str) -> Optional[str]:
+        async with sem:
+            return await self._generate_summary(subject, body)
+    
+    async def _summarize_all(self, emails: List[Tuple[str, str]]) -> List[str]:
+        """
+        Summarize (subject, body) pairs, reusing cached summaries and calling
+        OpenAI concurrently for the rest, at most summary_concurrency at a time.
+        """
+        content_hashes = [self._summary_key(subject, body) for subject, body in emails]
+        summaries = self._get_cached_summaries(content_hashes)
+        
+        # Identical emails within the run are summarized only once
+        misses = {
+            content_hash: email for content_hash, email in zip(content_hashes, emails)
+            if content_hash not in summaries
+        }
+        sem = asyncio.Semaphore(self.summary_concurrency)
+        tasks = [self._summarize_with_sem(sem, subject, body) for subject, body in misses.values()]
+        generated = await asyncio.gather(*tasks)
+        
+        new_summaries = {
+            content_hash: summary for content_hash, summary in zip(misses, generated)
+            if summary is not None
+        }
+        self._store_summaries(new_summaries)
+        summaries.update(new_summaries)
+        
+        return [
+            summaries.get(content_hash, f"요약 생성 실패: {subject}")
+            for content_hash, (subject, _) in zip(content_hashes, emails)
+        ]
     
-    def _decode_message_part(self, part: Dict) -> str:
+    def _decode_message_part(self, part: Dict) -> bytes:
+        """Return the raw bytes of a message part; decoding to str is left to the caller."""
         data = part.get('body', {}).get('data', '')
         if data:
-            return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-        return ''
+            return base64.urlsafe_b64decode(data)
+        return b''
+    
+    @staticmethod
+    def _html_to_text(html_content: bytes) -> str:
+        """Convert HTML bytes to text with selectolax, falling back to tag stripping."""
+        if LexborHTMLParser is not None:
+            try:
+                tree = LexborHTMLParser(html_content)
+                tree.strip_tags(['script', 'style'])
+                return tree.text(separator=' ', strip=True)
+            except Exception as e:
+                logger.warning(f"HTML parsing failed, stripping tags instead: {e}")
+        return _HTML_TAG_RE.sub(b'', html_content).decode('utf-8', errors='ignore')
     
     def _extract_text_from_message(self, payload: Dict) -> str:
         text_content = ""
         
         if payload.get('mimeType') == 'text/plain':
-            text_content = self._decode_message_part(payload)
+            text_content = self._decode_message_part(payload).decode('utf-8', errors='ignore')
         elif payload.get('mimeType') == 'text/html':
             html_content = self._decode_message_part(payload)
-            text_content = re.sub(r'<[^>]+>', '', html_content)
+            text_content = self._html_to_text(html_content)
         elif payload.get('parts'):
             for part in payload['parts']:
                 if part.get('mimeType') == 'text/plain':
-                    text_content += self._decode_message_part(part)
+                    text_content += self._decode_message_part(part).decode('utf-8', errors='ignore')
                 elif part.get('mimeType') == 'text/html':
                     html_content = self._decode_message_part(part)
-                    text_content += re.sub(r'<[^>]+>', '', html_content)
+                    text_content += self._html_to_text(html_content)
         
         return text_content.strip()
     
-    def _email_already_processed(self, gmail_message_id: str) -> bool:
-        """Check if an email with this Gmail message ID has already been processed."""
-        try:
-            response = self.supabase.table('mail_history').select('id').eq('gmail_message_id', gmail_message_id).execute()
-            return len(response.data) > 0
-        except Exception as e:
-            logger.error(f"Error checking if email already processed: {e}")
-            return False
+    def _get_processed_message_ids(self, message_ids: List[str]) -> set:
+        """Return the Gmail message IDs already stored in mail_history, one IN query per chunk."""
+        processed = set()
+        for start in range(0, len(message_ids), IN_QUERY_BATCH_SIZE):
+            chunk = message_ids[start:start + IN_QUERY_BATCH_SIZE]
+            try:
+                response = self.supabase.table('mail_history').select('gmail_message_id').in_('gmail_message_id', chunk).execute()
+            except Exception as e:
+                # Unchecked emails are processed; the upsert still drops duplicates
+                logger.error(f"Error checking if emails already processed: {e}")
+                continue
+            processed.update(row['gmail_message_id'] for row in response.data)
+        return processed
     
-    def process_email(self, message_id: str) -> bool:
+    def fetch_messages_batch(self, message_ids: List[str]) -> List[Dict]:
+        """Fetch full messages using Gmail batch HTTP requests, preserving order."""
+        messages: Dict[str, Dict] = {}
+        failed_ids: List[str] = []
+        rate_limited_ids: List[str] = []
+        
+        def _on_response(request_id, response, exception):
+            if exception is None:
+                messages[request_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status == 429:
+                rate_limited_ids.append(request_id)
+            else:
+                logger.warning(f"Batch fetch failed for message {request_id}: {exception}")
+                failed_ids.append(request_id)
+        
+        def _execute_batches(batch_ids: List[str]):
+            for start in range(0, len(batch_ids), GMAIL_BATCH_SIZE):
+                chunk = batch_ids[start:start + GMAIL_BATCH_SIZE]
+                batch = self.gmail_service.new_batch_http_request(callback=_on_response)
+                for message_id in chunk:
+                    batch.add(
+                        self.gmail_service.users().messages().get(userId='me', id=message_id, format='full'),
+                        request_id=message_id
+                    )
+                try:
+                    batch.execute()
+                except Exception as e:
+                    logger.warning(f"Batch request failed, falling back to single fetches: {e}")
+                    failed_ids.extend(
+                        message_id for message_id in chunk
+                        if message_id not in messages and message_id not in failed_ids
+                        and message_id not in rate_limited_ids
+                    )
+        
+        _execute_batches(message_ids)
+        
+        # Re-batch calls rejected as rate limited after an exponential backoff
+        backoff = GMAIL_RATE_LIMIT_BACKOFF_SECONDS
+        for _ in range(GMAIL_RATE_LIMIT_RETRIES):
+            if not rate_limited_ids:
+                break
+            retry_ids = list(rate_limited_ids)
+            rate_limited_ids.clear()
+            logger.warning(f"{len(retry_ids)} message fetches were rate limited, retrying in {backoff:g}s")
+            time.sleep(backoff)
+            backoff *= 2
+            _execute_batches(retry_ids)
+        for message_id in rate_limited_ids:
+            logger.error(f"Error fetching message {message_id}: still rate limited after "
+                         f"{GMAIL_RATE_LIMIT_RETRIES} retries")
+        
+        # Retry anything else the batch could not deliver one message at a time
+        for message_id in failed_ids:
+            try:
+                messages[message_id] = self.gmail_service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='full'
+                ).execute()
+            except Exception as error:
+                # Timeouts and connection errors fail this message only; the
+                # caller counts missing messages as failed
+                logger.error(f"Error fetching message {message_id}: {error}")
+        
+        return [messages[message_id] for message_id in message_ids if message_id in messages]
+    
+    def _parse_message(self, message: Dict) -> Optional[Dict]:
+        """Extract sender, headers and body text from a fetched message."""
+        message_id = message.get('id')
         try:
-            # Check if this email has already been processed
-            if self._email_already_processed(message_id):
-                logger.info(f"Email {message_id} already processed, skipping...")
-                return True
-            
-            message = self.gmail_service.users().messages().get(
-                userId='me', 
-                id=message_id,
-                format='full'
-            ).execute()
-            
             payload = message['payload']
             headers = payload.get('headers', [])
             
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            from_address = next((h['value'] for h in headers if h['name'] == 'From'), '')
-            date_header = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+            # Case-insensitive lookup; reversed so the first occurrence wins
+            header_map = {h['name'].lower(): h['value'] for h in reversed(headers)}
             
-            email_addr = self._extract_email_from_address(from_address)
-            sender_name = self._extract_name_from_address(from_address)
+            subject = header_map.get('subject', 'No Subject')
+            from_address = header_map.get('from', '')
+            date_header = header_map.get('date', '')
+            
+            email_addr = _extract_email_from_address(from_address)
+            sender_name = _extract_name_from_address(from_address)
             
             if not email_addr:
                 logger.warning(f"Could not extract valid email from: {from_address}")
-                return False
+                return None
+            
+            return {
+                'message_id': message_id,
+                'subject': subject,
+                'from_address': from_address,
+                'date_header': date_header,
+                'email': email_addr,
+                'name': sender_name,
+                'body_content': self._extract_text_from_message(payload),
+            }
             
-            body_content = self._extract_text_from_message(payload)
+        except Exception as e:
+            logger.error(f"Error processing email {message_id}: {e}")
+            return None
+    
+    def _build_mail_data(self, parsed: Dict) -> Optional[Tuple[Dict, str]]:
+        """
+        Resolve the company entity of a parsed message and build its row.
+        
+        Returns the mail_history row (without summary) and the body text,
+        or None if the message cannot be stored.
+        """
+        message_id = parsed['message_id']
+        try:
+            subject = parsed['subject']
+            from_address = parsed['from_address']
+            date_header = parsed['date_header']
+            email_addr = parsed['email']
+            body_content = parsed['body_content']
             
-            company_entity_id = self.find_or_create_company_entity(email_addr, sender_name, subject, body_content)
+            company_entity_id = self.find_or_create_company_entity(email_addr, parsed['name'], subject, body_content)
             if not company_entity_id:
                 logger.error(f"Failed to create/find company entity for {email_addr}")
-                return False
+                return None
             
             original_content = f"From: {from_address}\nSubject: {subject}\n\n{body_content}"
             
-            summary = self.summarize_email_content(subject, body_content)
-            
             received_date = None
             if date_header:
                 try:
-                    from email.utils import parsedate_to_datetime
                     received_date = parsedate_to_datetime(date_header).isoformat()
                 except:
                     logger.warning(f"Could not parse date: {date_header}")
@@ -298,59 +685,193 @@ class GmailProcessor:
             mail_data = {
                 'title': subject,
                 'original_content': original_content,
-                'summarized_content': summary,
+                'summarized_content': None,
                 'received_date': received_date,
                 'company_entity_id': company_entity_id,
                 'receiver_mail': self.user_email,
                 'gmail_message_id': message_id
             }
             
-            response = self.supabase.table('mail_history').insert(mail_data).execute()
+            return mail_data, body_content
+                
+        except Exception as e:
+            logger.error(f"Error processing email {message_id}: {e}")
+            return None
+    
+    def _insert_mail_history(self, mail_data: Dict) -> bool:
+        try:
+            response = self.supabase.table('mail_history').upsert(
+                mail_data, on_conflict='gmail_message_id', ignore_duplicates=True
+            ).execute()
             
             if response.data:
-                logger.info(f"Successfully processed email: {subject}")
-                return True
+                logger.info(f"Successfully processed email: {mail_data['title']}")
             else:
-                logger.error(f"Failed to insert mail history for: {subject}")
-                return False
+                logger.info(f"Email {mail_data['gmail_message_id']} already processed, skipping...")
+            return True
                 
         except Exception as e:
-            logger.error(f"Error processing email {message_id}: {e}")
+            logger.error(f"Error processing email {mail_data['gmail_message_id']}: {e}")
             return False
     
-    def get_messages(self, query: str = '', max_results: int = 100) -> List[str]:
+    def prepare_email(self, message: Dict) -> Optional[Tuple[Dict, str]]:
+        """
+        Parse a fetched message and resolve its company entity.
+        
+        Returns the mail_history row (without summary) and the body text,
+        or None if the message cannot be stored.
+        """
+        parsed = self._parse_message(message)
+        if parsed is None:
+            return None
+        return self._build_mail_data(parsed)
+    
+    def _insert_mail_history_batch(self, rows: List[Dict]) -> int:
+        """Insert many mail_history rows at once; returns how many were stored or already present."""
+        if not rows:
+            return 0
+        
         try:
-            results = self.gmail_service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_results
+            # Rows stored by an overlapping run since the pre-check are skipped
+            response = self.supabase.table('mail_history').upsert(
+                rows, on_conflict='gmail_message_id', ignore_duplicates=True
             ).execute()
+            logger.info(f"Successfully stored {len(response.data)} emails")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Bulk insert of {len(rows)} emails failed, retrying one by one: {e}")
+        
+        # Insert rows individually to isolate the bad record
+        return sum(self._insert_mail_history(row) for row in rows)
+    
+    def process_email(self, message: Dict) -> bool:
+        prepared = self.prepare_email(message)
+        if prepared is None:
+            return False
+        
+        mail_data, body_content = prepared
+        mail_data['summarized_content'] = self._loop.run_until_complete(
+            self.summarize_email_content(mail_data['title'], body_content)
+        )
+        return self._insert_mail_history(mail_data)
+    
+    def iter_message_ids(self, query: str = '', max_results: int = 100) -> Iterator[str]:
+        """Yield up to max_results message IDs, following pageToken one list page at a time."""
+        page_token = None
+        fetched = 0
+        while fetched < max_results:
+            try:
+                results = self.gmail_service.users().messages().list(
+                    userId='me',
+                    q=query,
+                    maxResults=min(GMAIL_LIST_PAGE_SIZE, max_results - fetched),
+                    pageToken=page_token
+                ).execute()
+            except HttpError as error:
+                logger.error(f'An error occurred: {error}')
+                return
             
             messages = results.get('messages', [])
-            return [msg['id'] for msg in messages]
+            for msg in messages:
+                yield msg['id']
+            fetched += len(messages)
             
-        except HttpError as error:
-            logger.error(f'An error occurred: {error}')
-            return []
+            page_token = results.get('nextPageToken')
+            if not page_token or not messages:
+                return
+    
+    def get_messages(self, query: str = '', max_results: int = 100) -> List[str]:
+        return list(self.iter_message_ids(query, max_results))
     
     def process_all_messages(self, query: str = '', max_results: int = 100):
         logger.info(f"Starting to process emails with query: '{query}', max_results: {max_results}")
         
-        message_ids = self.get_messages(query, max_results)
-        logger.info(f"Found {len(message_ids)} messages to process")
+        processed_count = 0
+        failed_count = 0
+        
+        # IDs are streamed page by page, so processing starts after the first
+        # list call and memory stays bounded on large crawls
+        message_ids = self.iter_message_ids(query, max_results)
+        while batch_ids := list(islice(message_ids, PROCESS_BATCH_SIZE)):
+            logger.info(f"Found {len(batch_ids)} messages to process")
+            processed, failed = self._process_message_batch(batch_ids)
+            processed_count += processed
+            failed_count += failed
         
+        logger.info(f"Processing completed. Processed: {processed_count}, Failed: {failed_count}")
+    
+    def _process_message_batch(self, message_ids: List[str]) -> Tuple[int, int]:
+        """Run one batch of message IDs through the pipeline; returns (processed, failed) counts."""
         processed_count = 0
         failed_count = 0
         
-        for i, message_id in enumerate(message_ids, 1):
-            logger.info(f"Processing message {i}/{len(message_ids)}: {message_id}")
-            
-            if self.process_email(message_id):
+        # Check if emails have already been processed before fetching them.
+        # messages().list() already returns the Gmail IDs stored in
+        # mail_history.gmail_message_id, so already-seen emails are dropped
+        # here and only unseen ones are downloaded with format='full'; a
+        # separate format='metadata' pass would only add a round trip.
+        processed_ids = self._get_processed_message_ids(message_ids)
+        new_message_ids = []
+        for message_id in message_ids:
+            if message_id in processed_ids:
+                logger.info(f"Email {message_id} already processed, skipping...")
                 processed_count += 1
             else:
+                new_message_ids.append(message_id)
+        
+        messages = self.fetch_messages_batch(new_message_ids)
+        failed_count += len(new_message_ids) - len(messages)
+        
+        parsed_messages = []
+        for message in messages:
+            parsed = self._parse_message(message)
+            if parsed is None:
                 failed_count += 1
+            else:
+                parsed_messages.append(parsed)
         
-        logger.info(f"Processing completed. Processed: {processed_count}, Failed: {failed_count}")
+        # Resolve all senders up front: one SELECT for known entities and
+        # one bulk INSERT for new ones
+        self._preload_company_entities([parsed['email'] for parsed in parsed_messages])
+        self._create_company_entities(parsed_messages)
+        
+        # Remaining per-message work (entity backfill, row building) is I/O
+        # bound; googleapiclient is not used past this point, so the shared
+        # Supabase and OpenAI clients can be used from worker threads.
+        # Messages of one sender run in order on a single worker, so entity
+        # backfill sees fields filled by earlier messages instead of racing
+        # on the same row; different senders run in parallel.
+        logger.info(f"Processing {len(parsed_messages)} messages")
+        messages_by_sender: Dict[str, List[Dict]] = {}
+        for parsed in parsed_messages:
+            messages_by_sender.setdefault(parsed['email'], []).append(parsed)
+        
+        with ThreadPoolExecutor(max_workers=PROCESSING_WORKERS) as executor:
+            sender_results = list(executor.map(
+                lambda sender_messages: [self._build_mail_data(parsed) for parsed in sender_messages],
+                messages_by_sender.values()
+            ))
+        results = [result for sender_result in sender_results for result in sender_result]
+        
+        prepared = [result for result in results if result is not None]
+        failed_count += len(results) - len(prepared)
+        
+        # Summaries are independent network calls; run them concurrently
+        summaries = self._loop.run_until_complete(self._summarize_all(
+            [(mail_data['title'], body_content) for mail_data, body_content in prepared]
+        ))
+        
+        pending_rows = []
+        for (mail_data, _), summary in zip(prepared, summaries):
+            mail_data['summarized_content'] = summary
+            pending_rows.append(mail_data)
+        
+        for start in range(0, len(pending_rows), MAIL_INSERT_BATCH_SIZE):
+            inserted = self._insert_mail_history_batch(pending_rows[start:start + MAIL_INSERT_BATCH_SIZE])
+            processed_count += inserted
+            failed_count += len(pending_rows[start:start + MAIL_INSERT_BATCH_SIZE]) - inserted
+        
+        return processed_count, failed_count
 
 def main():
     processor = GmailProcessor()
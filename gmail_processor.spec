@@ -10,6 +10,7 @@ a = Analysis(
     binaries=[],
     datas=[
         ('email_extractor.py', '.'),
+        ('rate_limiter.py', '.'),
         ('.env', '.'),
         ('credentials.json', '.'),
     ],
@@ -22,6 +23,10 @@ a = Analysis(
         'supabase',
         'openai',
         'email_validator',
+        'ahocorasick',
+        'orjson',
+        'selectolax.lexbor',
+        're2',
         'dotenv',
         'pkg_resources.py2_warn'
     ],
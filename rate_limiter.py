@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Rate limiting for OpenAI requests.
+
+Tracks the request and token budgets OpenAI reports in its x-ratelimit-*
+response headers and holds new requests back until the budget allows them,
+instead of letting them fail with 429 and retry.
+"""
+
+import re
+import time
+import asyncio
+import threading
+from typing import Mapping, Optional
+
+# OpenAI counts roughly 4 characters per token when checking rate limits
+CHARS_PER_TOKEN = 4
+
+# Longest single wait before the budget is re-checked
+MAX_WAIT_SECONDS = 5.0
+
+# Refill interval assumed after a reset until a response reports the real one;
+# keeps callers from waiting forever when requests fail without headers
+FALLBACK_RESET_SECONDS = 60.0
+
+# Reset durations look like "1s", "6m0s", "120ms" or "1h2m3.5s"
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Convert an OpenAI reset duration to seconds."""
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Estimate the tokens a request counts against the limit: prompt plus completion."""
+    return len(prompt) // CHARS_PER_TOKEN + max_tokens
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every OpenAI request of one API key.
+
+    The budget is unknown until the first response arrives; after that each
+    request reserves one request and its estimated tokens, and waits for the
+    reported reset when either runs out. Thread-safe, with blocking acquire()
+    for worker threads and awaitable aacquire() for asyncio code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._request_limit: Optional[int] = None
+        self._token_limit: Optional[int] = None
+        self._requests_remaining: Optional[int] = None
+        self._tokens_remaining: Optional[int] = None
+        self._requests_reset_at = 0.0
+        self._tokens_reset_at = 0.0
+        self._blocked_until = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve budget for one request, or return how long to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            # A passed reset refills the bucket to the reported limit; the next
+            # response's headers replace the assumed following reset time
+            if self._requests_remaining is not None and now >= self._requests_reset_at:
+                self._requests_remaining = self._request_limit
+                self._requests_reset_at = now + FALLBACK_RESET_SECONDS
+            if self._tokens_remaining is not None and now >= self._tokens_reset_at:
+                self._tokens_remaining = self._token_limit
+                self._tokens_reset_at = now + FALLBACK_RESET_SECONDS
+
+            if self._requests_remaining is not None and self._requests_remaining < 1:
+                return self._requests_reset_at - now
+            # A request larger than the whole bucket is let through once it is full
+            if (self._tokens_remaining is not None and self._tokens_remaining < tokens
+                    and self._tokens_remaining != self._token_limit):
+                return self._tokens_reset_at - now
+
+            if self._requests_remaining is not None:
+                self._requests_remaining -= 1
+            if self._tokens_remaining is not None:
+                self._tokens_remaining -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int = 0):
+        """Block until a request estimated at tokens may be sent."""
+        while (wait := self._reserve(tokens)) > 0:
+            time.sleep(min(wait, MAX_WAIT_SECONDS))
+
+    async def aacquire(self, tokens: int = 0):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        while (wait := self._reserve(tokens)) > 0:
+            await asyncio.sleep(min(wait, MAX_WAIT_SECONDS))
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Adopt the budget reported by a response's x-ratelimit-* and retry-after headers."""
+        now = time.monotonic()
+        request_limit = _parse_int(headers.get('x-ratelimit-limit-requests'))
+        token_limit = _parse_int(headers.get('x-ratelimit-limit-tokens'))
+        requests_remaining = _parse_int(headers.get('x-ratelimit-remaining-requests'))
+        tokens_remaining = _parse_int(headers.get('x-ratelimit-remaining-tokens'))
+        requests_reset = _parse_duration(headers.get('x-ratelimit-reset-requests', ''))
+        tokens_reset = _parse_duration(headers.get('x-ratelimit-reset-tokens', ''))
+
+        retry_after = None
+        if headers.get('retry-after-ms'):
+            retry_after = _parse_int(headers['retry-after-ms'])
+            retry_after = retry_after / 1000 if retry_after is not None else None
+        elif headers.get('retry-after'):
+            retry_after = _parse_int(headers['retry-after'])
+
+        with self._lock:
+            if request_limit is not None:
+                self._request_limit = request_limit
+            if token_limit is not None:
+                self._token_limit = token_limit
+            # The server's count is authoritative and replaces local estimates
+            if requests_remaining is not None:
+                self._requests_remaining = requests_remaining
+                self._requests_reset_at = now + (requests_reset or 0.0)
+            if tokens_remaining is not None:
+                self._tokens_remaining = tokens_remaining
+                self._tokens_reset_at = now + (tokens_reset or 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def update_from_error(self, error: Exception):
+        """Adopt the headers of a failed request, e.g. a 429 with retry-after."""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            self.update_from_headers(response.headers)